@@ -6,12 +6,69 @@ Based on Codemagic CLI Tools implementation.
 """
 
 import argparse
+import contextlib
+import io
+import os
 import pathlib
+import runpy
 import subprocess
 import sys
 import json
+import logging
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+# Location of the bundled Codemagic CLI tools source, resolved once at import
+_CLI_TOOLS_SRC = pathlib.Path(__file__).resolve().parent / "cli-tools" / "src"
+
+# Make the bundled Codemagic CLI tools importable in this interpreter so the
+# tools can run in-process instead of paying a second interpreter startup
+# (and import of the full Codemagic package) per invocation.
+sys.path.insert(0, str(_CLI_TOOLS_SRC))
+
+# (args attribute, CLI flag, kind) specs for the xcode-project build-ipa
+# and app-store-connect publish argv
+_BUILD_FLAGS = (
+    ("scheme", "--scheme", "str"),
+    ("target", "--target", "str"),
+    ("configuration", "--configuration", "str"),
+    ("clean", "--clean", "store_true"),
+    ("archive_directory", "--archive-directory", "str"),
+    ("ipa_directory", "--ipa-directory", "str"),
+    ("export_options_plist", "--export-options-plist", "str"),
+    ("remove_xcarchive", "--remove-xcarchive", "store_true"),
+)
+
+_PUBLISH_FLAGS = (
+    ("key_identifier", "--key-id", "str"),
+    ("issuer_id", "--issuer-id", "str"),
+    ("apple_id", "--apple-id", "str"),
+    ("app_specific_password", "--app-specific-password", "str"),
+    ("submit_to_app_store", "--submit-to-app-store", "store_true"),
+    ("version_string", "--version-string", "str"),
+    ("whats_new", "--whats-new", "str"),
+    ("description", "--description", "str"),
+    ("keywords", "--keywords", "str"),
+    ("marketing_url", "--marketing-url", "str"),
+    ("support_url", "--support-url", "str"),
+    ("copyright", "--copyright", "str"),
+    ("earliest_release_date", "--earliest-release-date", "str"),
+    ("phased_release", "--enable-phased-release", "store_true"),
+    ("cancel_previous_submissions", "--cancel-previous-submissions", "store_true"),
+    ("max_build_processing_wait", "--max-build-processing-wait", "str"),
+)
+
+
+def _append_flags(cmd: List[str], args: argparse.Namespace, spec: Tuple[Tuple[str, str, str], ...]) -> None:
+    """Append a CLI flag to cmd for every truthy args attribute in spec"""
+    for attr, flag, kind in spec:
+        value = getattr(args, attr, None)
+        if not value:
+            continue
+        if kind == "store_true":
+            cmd.append(flag)
+        else:
+            cmd.extend((flag, str(value)))
 
 
 class SubmitAppException(Exception):
@@ -19,6 +76,44 @@ class SubmitAppException(Exception):
     pass
 
 
+class _LineScanner(io.TextIOBase):
+    """
+    Line-oriented stdout sink that scans for a built IPA path.
+
+    Keeps memory bounded on large xcodebuild logs: each line is inspected
+    once for an existing .ipa path, forwarded to the real stdout only when
+    echoing is enabled, and then discarded instead of being buffered whole.
+    The stat only runs on lines that end in .ipa, so scanning stays cheap.
+    """
+
+    def __init__(self, echo: bool = False):
+        super().__init__()
+        self.echo = echo
+        self.ipa_candidate: Optional[str] = None
+        self._pending = ""
+
+    def write(self, text: str) -> int:
+        if self.echo:
+            sys.__stdout__.write(text)
+        self._pending += text
+        while "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            self._scan_line(line)
+        return len(text)
+
+    def flush(self) -> None:
+        if self._pending:
+            self._scan_line(self._pending)
+            self._pending = ""
+        if self.echo:
+            sys.__stdout__.flush()
+
+    def _scan_line(self, line: str) -> None:
+        line = line.rstrip()
+        if line.endswith(".ipa") and pathlib.Path(line).exists():
+            self.ipa_candidate = line
+
+
 class SubmitApp:
     """
     Unified tool for building IPA and submitting to App Store Connect
@@ -26,15 +121,11 @@ class SubmitApp:
     
     def __init__(self):
         self.verbose = False
-        
-    def log(self, message: str, level: str = "INFO"):
-        """Simple logging function"""
-        if self.verbose or level == "ERROR":
-            print(f"[{level}] {message}")
-    
+        self._logger = logging.getLogger("submit_app")
+
     def run_command(self, command: List[str], capture_output: bool = True) -> subprocess.CompletedProcess:
         """Run a shell command and return the result"""
-        self.log(f"Running command: {' '.join(command)}")
+        self._logger.debug("Running command: %s", command)
         try:
             result = subprocess.run(
                 command, 
@@ -44,17 +135,38 @@ class SubmitApp:
             )
             return result
         except subprocess.CalledProcessError as e:
-            self.log(f"Command failed: {e}", "ERROR")
-            self.log(f"stdout: {e.stdout}", "ERROR")
-            self.log(f"stderr: {e.stderr}", "ERROR")
+            self._logger.error("Command failed: %s", e)
+            self._logger.error("stdout: %s", e.stdout)
+            self._logger.error("stderr: %s", e.stderr)
             raise SubmitAppException(f"Command failed: {' '.join(command)}")
-    
+
+    def run_codemagic_tool(self, module: str, argv: List[str], stdout: Optional[io.TextIOBase] = None) -> None:
+        """Run a Codemagic CLI tool module in-process, streaming its stdout"""
+        self._logger.debug("Running tool: %s %s", module, argv)
+        sink = stdout if stdout is not None else _LineScanner(echo=self.verbose)
+        original_argv = sys.argv
+        sys.argv = [module] + argv
+        try:
+            with contextlib.redirect_stdout(sink):
+                runpy.run_module(module, run_name="__main__")
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if exit_code != 0:
+                self._logger.error("Tool failed with exit code %s: %s", exit_code, module)
+                raise SubmitAppException(f"Command failed: {module} {' '.join(argv)}")
+        except Exception as e:
+            self._logger.error("Tool failed: %s", e)
+            raise SubmitAppException(f"Command failed: {module} {' '.join(argv)}")
+        finally:
+            sink.flush()
+            sys.argv = original_argv
+
     def build_ipa(self, args: argparse.Namespace) -> pathlib.Path:
         """Build IPA using xcode-project build-ipa"""
-        self.log("Building IPA...")
+        self._logger.info("Building IPA...")
         
-        # Build the xcode-project command
-        cmd = ["python3", "-m", "codemagic.tools.xcode_project", "build-ipa"]
+        # Build the xcode-project argv
+        cmd = ["build-ipa"]
         
         # Add project/workspace path
         if args.xcode_project:
@@ -65,144 +177,55 @@ class SubmitApp:
             raise SubmitAppException("Either --xcode-project or --xcode-workspace must be specified")
         
         # Add optional parameters
-        if args.scheme:
-            cmd.extend(["--scheme", args.scheme])
-        if args.target:
-            cmd.extend(["--target", args.target])
-        if args.configuration:
-            cmd.extend(["--configuration", args.configuration])
-        if args.clean:
-            cmd.append("--clean")
-        if args.archive_directory:
-            cmd.extend(["--archive-directory", str(args.archive_directory)])
-        if args.ipa_directory:
-            cmd.extend(["--ipa-directory", str(args.ipa_directory)])
-        if args.export_options_plist:
-            cmd.extend(["--export-options-plist", str(args.export_options_plist)])
-        if args.remove_xcarchive:
-            cmd.append("--remove-xcarchive")
-        
-        # Set PYTHONPATH to include the cli-tools src directory
-        env = {
-            "PYTHONPATH": str(pathlib.Path(__file__).parent / "cli-tools" / "src")
-        }
-        
-        try:
-            # Change to cli-tools directory and run the command
-            result = subprocess.run(
-                cmd,
-                cwd=pathlib.Path(__file__).parent / "cli-tools",
-                env={**subprocess.os.environ, **env},
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            # Parse the output to find the IPA path
-            # The build-ipa command typically outputs the path to the built IPA
-            output_lines = result.stdout.strip().split('\n')
-            ipa_path = None
-            
-            # Look for IPA file in the output or use default location
-            for line in output_lines:
-                if line.endswith('.ipa') and pathlib.Path(line).exists():
-                    ipa_path = pathlib.Path(line)
-                    break
-            
-            if not ipa_path:
-                # Default IPA location
-                ipa_dir = args.ipa_directory or pathlib.Path("build/ios/ipa")
-                ipa_files = list(ipa_dir.glob("*.ipa"))
-                if ipa_files:
-                    ipa_path = ipa_files[0]  # Take the first IPA found
-                else:
-                    raise SubmitAppException("Could not find built IPA file")
-            
-            self.log(f"Successfully built IPA: {ipa_path}")
-            return ipa_path
-            
-        except subprocess.CalledProcessError as e:
-            self.log(f"IPA build failed: {e}", "ERROR")
-            self.log(f"stdout: {e.stdout}", "ERROR")
-            self.log(f"stderr: {e.stderr}", "ERROR")
-            raise SubmitAppException("IPA build failed")
+        _append_flags(cmd, args, _BUILD_FLAGS)
+
+        # The build-ipa command typically outputs the path to the built IPA;
+        # the scanner picks it up line by line while the tool runs
+        scanner = _LineScanner(echo=self.verbose)
+        self.run_codemagic_tool("codemagic.tools.xcode_project", cmd, stdout=scanner)
+
+        # Check the IPA output directory first: one directory read instead of
+        # a stat call per log line
+        ipa_dir = args.ipa_directory or pathlib.Path("build/ios/ipa")
+        ipa_path = None
+        if ipa_dir.is_dir():
+            with os.scandir(ipa_dir) as entries:
+                ipa_path = next(
+                    (pathlib.Path(entry.path) for entry in entries
+                     if entry.name.endswith(".ipa") and entry.is_file()),
+                    None
+                )
+
+        if not ipa_path:
+            # Fall back to the path the tool printed, if any
+            if scanner.ipa_candidate and pathlib.Path(scanner.ipa_candidate).exists():
+                ipa_path = pathlib.Path(scanner.ipa_candidate)
+            else:
+                raise SubmitAppException("Could not find built IPA file")
+
+        self._logger.info("Successfully built IPA: %s", ipa_path)
+        return ipa_path
     
     def submit_to_app_store(self, ipa_path: pathlib.Path, args: argparse.Namespace) -> None:
         """Submit IPA to App Store Connect using the publish action"""
-        self.log(f"Submitting IPA to App Store Connect: {ipa_path}")
+        self._logger.info("Submitting IPA to App Store Connect: %s", ipa_path)
         
-        # Build the app-store-connect publish command
-        cmd = ["python3", "-m", "codemagic.tools.app_store_connect", "publish", str(ipa_path)]
+        # Build the app-store-connect publish argv
+        cmd = ["publish", str(ipa_path)]
         
-        # Add authentication parameters
-        if args.key_identifier:
-            cmd.extend(["--key-id", args.key_identifier])
-        if args.issuer_id:
-            cmd.extend(["--issuer-id", args.issuer_id])
+        # The private key comes from inline content or a file reference, so it
+        # cannot be expressed as a plain flag spec
         if args.private_key:
             cmd.extend(["--private-key", args.private_key])
         elif args.private_key_path:
             cmd.extend(["--private-key", f"@file:{args.private_key_path}"])
-        
-        # Alternative authentication (username/password)
-        if args.apple_id:
-            cmd.extend(["--apple-id", args.apple_id])
-        if args.app_specific_password:
-            cmd.extend(["--app-specific-password", args.app_specific_password])
-        
-        # App Store submission parameters
-        if args.submit_to_app_store:
-            cmd.append("--submit-to-app-store")
-        if args.version_string:
-            cmd.extend(["--version-string", args.version_string])
-        if args.whats_new:
-            cmd.extend(["--whats-new", args.whats_new])
-        if args.description:
-            cmd.extend(["--description", args.description])
-        if args.keywords:
-            cmd.extend(["--keywords", args.keywords])
-        if args.marketing_url:
-            cmd.extend(["--marketing-url", args.marketing_url])
-        if args.support_url:
-            cmd.extend(["--support-url", args.support_url])
-        if args.copyright:
-            cmd.extend(["--copyright", args.copyright])
-        if args.earliest_release_date:
-            cmd.extend(["--earliest-release-date", args.earliest_release_date])
-        if args.phased_release:
-            cmd.append("--enable-phased-release")
-        if args.cancel_previous_submissions:
-            cmd.append("--cancel-previous-submissions")
-        
-        # Processing wait parameters
-        if args.max_build_processing_wait:
-            cmd.extend(["--max-build-processing-wait", str(args.max_build_processing_wait)])
-        
-        # Set PYTHONPATH to include the cli-tools src directory
-        env = {
-            "PYTHONPATH": str(pathlib.Path(__file__).parent / "cli-tools" / "src")
-        }
-        
-        try:
-            # Change to cli-tools directory and run the command
-            result = subprocess.run(
-                cmd,
-                cwd=pathlib.Path(__file__).parent / "cli-tools",
-                env={**subprocess.os.environ, **env},
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            self.log("Successfully submitted to App Store Connect")
-            if self.verbose:
-                self.log(f"Output: {result.stdout}")
-                
-        except subprocess.CalledProcessError as e:
-            self.log(f"App Store Connect submission failed: {e}", "ERROR")
-            self.log(f"stdout: {e.stdout}", "ERROR")
-            self.log(f"stderr: {e.stderr}", "ERROR")
-            raise SubmitAppException("App Store Connect submission failed")
+
+        # Authentication, submission and processing wait parameters
+        _append_flags(cmd, args, _PUBLISH_FLAGS)
+
+        self.run_codemagic_tool("codemagic.tools.app_store_connect", cmd)
+
+        self._logger.info("Successfully submitted to App Store Connect")
     
     def submit_app(self, args: argparse.Namespace) -> None:
         """Main method that builds IPA and submits to App Store Connect"""
@@ -213,13 +236,13 @@ class SubmitApp:
             # Step 2: Submit to App Store Connect
             self.submit_to_app_store(ipa_path, args)
             
-            self.log("App submission completed successfully!")
+            self._logger.info("App submission completed successfully!")
             
         except SubmitAppException as e:
-            self.log(f"App submission failed: {e}", "ERROR")
+            self._logger.error("App submission failed: %s", e)
             sys.exit(1)
         except Exception as e:
-            self.log(f"Unexpected error: {e}", "ERROR")
+            self._logger.error("Unexpected error: %s", e)
             sys.exit(1)
 
 
@@ -343,6 +366,11 @@ def main():
     parser = create_argument_parser()
     args = parser.parse_args()
     
+    logging.basicConfig(
+        format="[%(levelname)s] %(message)s",
+        level=logging.DEBUG if args.verbose else logging.ERROR
+    )
+
     submit_app = SubmitApp()
     submit_app.verbose = args.verbose
     